@@ -1,7 +1,12 @@
 import csv
 import argparse
+
 import requests
 
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+http = TransportPolicy()
+
 # Branch protection settings
 protection_data = {
     "required_status_checks": {
@@ -19,6 +24,13 @@ protection_data = {
     "allow_force_pushes": False
 }
 
+def parse_status(value):
+    # "UNKNOWN" (a failed check) becomes None so the repo is skipped rather than overwritten
+    value = value.upper()
+    if value == "UNKNOWN":
+        return None
+    return value == "TRUE"
+
 def read_repo_data(repos_file, protection_file):
     # Read team repo list
     repos = {}
@@ -40,8 +52,8 @@ def read_repo_data(repos_file, protection_file):
             row = {k.strip(): v.strip() for k, v in row.items()}  # Normalize keys & values
             key = f"{row['Repository']}"
             if key in repos:
-                repos[key]["branch_protection"] = row["Branch Protection"].upper() == "TRUE"
-                repos[key]["rulesets"] = row["Rulesets Enabled"].upper() == "TRUE"
+                repos[key]["branch_protection"] = parse_status(row["Branch Protection"])
+                repos[key]["rulesets"] = parse_status(row["Rulesets Enabled"])
     return list(repos.values())
 
 def enable_branch_protection(org, repo, branch, token):
@@ -51,7 +63,7 @@ def enable_branch_protection(org, repo, branch, token):
         "Accept": "application/vnd.github+json",
         "Content-Type": "application/json"
     }
-    response = requests.put(url, headers=headers, json=protection_data)
+    response = http.put(url, endpoint="protection", headers=headers, json=protection_data)
 
     # Optional: print response JSON for debugging
     try:
@@ -69,11 +81,14 @@ def process_repos(org, token, repos, output_file="final_repo_status.csv"):
         team = item["team_slug"]
         repo = item["repo"]
         branch = item["branch"]
-        branch_protection = item.get("branch_protection", False)
-        rulesets = item.get("rulesets", False)
+        # Repos missing from the protection file were never checked, so treat them as unknown
+        branch_protection = item.get("branch_protection")
+        rulesets = item.get("rulesets")
 
         # Determine status
-        if branch_protection and not rulesets:
+        if branch_protection is None or rulesets is None:
+            status = "Skipped (protection status unknown)"
+        elif branch_protection and not rulesets:
             status = "Branch protection already enabled"
         elif not branch_protection and rulesets:
             status = "Rulesets already enabled"
@@ -81,8 +96,18 @@ def process_repos(org, token, repos, output_file="final_repo_status.csv"):
             status = "Branch protection & rulesets are enabled"
         else:
             # Apply branch protection
-            success = enable_branch_protection(org, repo, branch, token)
-            status = "Branch protection enabled via API" if success else "Failed to enable branch protection"
+            try:
+                success = enable_branch_protection(org, repo, branch, token)
+                status = "Branch protection enabled via API" if success else "Failed to enable branch protection"
+            except DeadlineExceeded:
+                # Raised before the request is sent, so nothing was changed
+                status = "Not attempted (run deadline exceeded)"
+            except requests.exceptions.Timeout:
+                # The PUT may still have been applied on the server
+                status = "Unknown (timed out)"
+            except requests.exceptions.RequestException as e:
+                print(f"{repo}/{branch} - Request failed: {e}")
+                status = "Unknown (request failed)"
 
         results.append([team, repo, branch, status])
 
@@ -93,16 +118,23 @@ def process_repos(org, token, repos, output_file="final_repo_status.csv"):
         writer.writerows(results)
 
 def main():
+    global http
+
     parser = argparse.ArgumentParser(description="Evaluate and update repo branch protection settings")
     parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
     parser.add_argument('--org', required=True, help='GitHub Organization')
     parser.add_argument('--repos', default="team_repos.csv", help='CSV file with team repositories')
     parser.add_argument('--protection', default="repo_protection_results.csv", help='CSV with current protection status')
     parser.add_argument('--output', default="final_repo_status.csv", help='Output CSV with actions taken')
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args)
 
     repos = read_repo_data(args.repos, args.protection)
     process_repos(args.org, args.pat, repos, args.output)
 
+    if args.http_stats:
+        http.print_stats()
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,10 @@
 import csv
 import argparse
-import requests
+import os
+
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+http = TransportPolicy()
 
 def check_branch_protection(org, repo, branch, token):
     url = f"https://api.github.com/repos/{org}/{repo}/branches/{branch}/protection"
@@ -8,7 +12,7 @@ def check_branch_protection(org, repo, branch, token):
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github+json"
     }
-    resp = requests.get(url, headers=headers)
+    resp = http.get(url, endpoint="protection", headers=headers)
     if resp.status_code == 200:
         return True
     elif resp.status_code == 404:
@@ -22,7 +26,7 @@ def check_rulesets(org, repo, token):
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github+json"
     }
-    resp = requests.get(url, headers=headers)
+    resp = http.get(url, endpoint="rulesets", headers=headers)
     if resp.status_code == 200:
         rulesets = resp.json()
         return len(rulesets) > 0
@@ -48,18 +52,23 @@ def save_results_to_csv(results, filename="repo_protection_results.csv"):
         writer.writerows(results)
 
 def main():
+    global http
+
     parser = argparse.ArgumentParser(description="Check GitHub repo branch protection and rulesets")
     parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
     parser.add_argument('--org', required=True, help='GitHub Organization')
     parser.add_argument('--input', default="team_repos.csv", help='Input CSV with repo list')
     parser.add_argument('--output', default="repo_protection_results.csv", help='Output CSV with results')
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args)
 
     token = args.pat
     org = args.org
     repo_list = read_repos_from_csv(args.input)
 
     results = []
+    truncated = False
     for team_slug, repo, branch in repo_list:
         try:
             protection_enabled = check_branch_protection(org, repo, branch, token)
@@ -73,12 +82,27 @@ def main():
                 "TRUE" if protection_enabled else "FALSE",
                 "TRUE" if rulesets_enabled else "FALSE"
             ])
-        except Exception:
-            # Silently skip if something fails
-            continue
+        except DeadlineExceeded:
+            print(f"⚠️ Run deadline exceeded at {repo}; remaining repos were not checked")
+            truncated = True
+            break
+        except Exception as e:
+            # Keep the row: apply_branchprotection.py skips UNKNOWN repos instead of overwriting them
+            print(f"Failed to check {repo}: {e}")
+            results.append([team_slug, repo, branch, "UNKNOWN", "UNKNOWN"])
 
     if results:
-        save_results_to_csv(results, args.output)
+        output = args.output
+        if truncated:
+            # A partial file must not be picked up by apply_branchprotection.py as the full status
+            root, ext = os.path.splitext(output)
+            output = f"{root}_TRUNCATED{ext}"
+        save_results_to_csv(results, output)
+        if truncated:
+            print(f"⚠️ Partial results written to {output}")
+
+    if args.http_stats:
+        http.print_stats()
 
 if __name__ == "__main__":
     main()
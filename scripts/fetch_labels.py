@@ -1,16 +1,23 @@
-import requests
 import argparse
 import csv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
 GITHUB_API_URL = "https://api.github.com"
 
+ENDPOINTS = {
+    "repos": {"read_timeout": 60},
+}
+
+http = TransportPolicy()
+
 def get_all_repos(org, headers):
     repos = []
     page = 1
     while True:
         url = f"{GITHUB_API_URL}/orgs/{org}/repos?per_page=100&page={page}"
-        response = requests.get(url, headers=headers)
+        response = http.get(url, endpoint="repos", headers=headers)
         if response.status_code != 200:
             raise Exception(f"Error fetching repos: {response.status_code} {response.text}")
         data = response.json()
@@ -25,9 +32,9 @@ def get_labels(repo_full_name, headers):
     page = 1
     while True:
         url = f"{GITHUB_API_URL}/repos/{repo_full_name}/labels?per_page=100&page={page}"
-        response = requests.get(url, headers=headers)
+        response = http.get(url, endpoint="labels", headers=headers)
         if response.status_code != 200:
-            break
+            raise Exception(f"Error fetching labels: {response.status_code} {response.text}")
         data = response.json()
         if not data:
             break
@@ -35,17 +42,15 @@ def get_labels(repo_full_name, headers):
         page += 1
     return labels
 
-def fetch_labels_threadsafe(repo_full_name, headers):
-    try:
-        return get_labels(repo_full_name, headers)
-    except Exception:
-        return []
-
 def main():
+    global http
+
     parser = argparse.ArgumentParser(description="Get unique labels across all org repos in parallel.")
     parser.add_argument("--org", required=True, help="GitHub organization name")
     parser.add_argument("--token", required=True, help="GitHub Personal Access Token")
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args, ENDPOINTS)
 
     headers = {
         "Authorization": f"token {args.token}",
@@ -53,31 +58,58 @@ def main():
     }
 
     print(f"Fetching all repositories from org '{args.org}'...")
-    repos = get_all_repos(args.org, headers)
+    try:
+        repos = get_all_repos(args.org, headers)
+    except DeadlineExceeded:
+        print("⚠️ Run deadline exceeded while listing repositories; nothing written")
+        return
     print(f"Total repositories found: {len(repos)}")
 
     unique_labels = set()
+    skipped = 0
+    failed = 0
     max_threads = 20  # adjust if needed
 
     print("Fetching labels in parallel...")
     with ThreadPoolExecutor(max_workers=max_threads) as executor:
         futures = {
-            executor.submit(fetch_labels_threadsafe, repo["full_name"], headers): repo["full_name"]
+            executor.submit(get_labels, repo["full_name"], headers): repo["full_name"]
             for repo in repos
         }
 
         for future in as_completed(futures):
-            repo_labels = future.result()
+            try:
+                repo_labels = future.result()
+            except DeadlineExceeded:
+                skipped += 1
+                continue
+            except Exception as e:
+                print(f"Failed to fetch labels for {futures[future]}: {e}")
+                failed += 1
+                continue
             unique_labels.update(label.strip() for label in repo_labels)
 
+    # Partial results go to a separate file so they are not mistaken for the full label set
+    output_file = "org_unique_labels_TRUNCATED.csv" if skipped or failed else "org_unique_labels.csv"
+
     # Write to CSV
-    with open("org_unique_labels.csv", "w", newline="", encoding="utf-8") as csvfile:
+    with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(["Label Name"])
         for label in sorted(unique_labels):
             writer.writerow([label])
 
-    print("\n✅ Done! Unique labels written to org_unique_labels.csv")
+    if args.http_stats:
+        http.print_stats()
+
+    if skipped:
+        print(f"\n⚠️ Run deadline exceeded; labels from {skipped} repos are missing.")
+    if failed:
+        print(f"\n⚠️ Labels could not be fetched for {failed} repos.")
+    if skipped or failed:
+        print(f"Partial results written to {output_file}")
+    else:
+        print(f"\n✅ Done! Unique labels written to {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,10 @@
-import requests
 import csv
 import argparse
 
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+http = TransportPolicy()
+
 def fetch_repos_and_branches(org, token, team_slug):
     url = f"https://api.github.com/orgs/{org}/teams/{team_slug}/repos"
     headers = {
@@ -12,7 +15,7 @@ def fetch_repos_and_branches(org, token, team_slug):
     repos = []
     page = 1
     while True:
-        resp = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
+        resp = http.get(url, endpoint="team_repos", headers=headers, params={"per_page": 100, "page": page})
         if resp.status_code != 200:
             raise Exception(f"Error: {resp.status_code} - {resp.text}")
         
@@ -43,29 +46,46 @@ def save_to_csv(data, filename="team_repos.csv"):
         writer.writerows(data)
 
 def main():
+    global http
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
     parser.add_argument('--org', required=True, help='GitHub Organization')
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args)
 
     # Read the team names from the input CSV
     team_names = read_team_names_from_csv("get_list_teams.csv")
     
     all_repos = []
+    truncated = False
     for team in team_names:
         try:
             # Fetch repositories for the team using the team name as slug
             team_repos = fetch_repos_and_branches(args.org, args.pat, team)
             all_repos.extend(team_repos)
+        except DeadlineExceeded:
+            # Keep what was fetched so far instead of failing every remaining team
+            print(f"⚠️ Run deadline exceeded at team '{team}'; remaining teams were not fetched")
+            truncated = True
+            break
         except Exception as e:
-            # Error handling: Skip teams where repo fetch fails, no output to terminal
-            pass
+            print(f"⚠️ Failed to fetch repos for team '{team}': {e}")
+            truncated = True
 
-    if all_repos:
+    if all_repos and truncated:
+        # Keep partial results away from the file the protection scripts read
+        save_to_csv(all_repos, "team_repos_TRUNCATED.csv")
+        print("⚠️ Partial results written to team_repos_TRUNCATED.csv")
+    elif all_repos:
         save_to_csv(all_repos)
     else:
         # If no repositories are found, no message will be shown
         pass
 
+    if args.http_stats:
+        http.print_stats()
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,12 @@
-import requests
 import argparse
 import csv
 
+import requests
+
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+http = TransportPolicy()
+
 def fetch_teams(org, token):
     url = f"https://api.github.com/orgs/{org}/teams"
     headers = {
@@ -12,7 +17,7 @@ def fetch_teams(org, token):
     teams = []
     page = 1
     while True:
-        resp = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
+        resp = http.get(url, endpoint="teams", headers=headers, params={"per_page": 100, "page": page})
         if resp.status_code != 200:
             raise Exception(f"Error: {resp.status_code} - {resp.text}")
         
@@ -33,13 +38,25 @@ def save_to_csv(teams, filename="get_list_teams.csv"):
     print(f"\n📄 Saved to {filename}")
 
 def main():
+    global http
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
     parser.add_argument('--org', required=True, help='GitHub Organization')
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args)
 
     print(f"🔍 Fetching teams from '{args.org}'...")
-    teams = fetch_teams(args.org, args.pat)
+    try:
+        teams = fetch_teams(args.org, args.pat)
+    except (DeadlineExceeded, requests.exceptions.RequestException) as e:
+        # A partial team list would silently drop teams downstream, so nothing is saved
+        print(f"⚠️ Failed to fetch teams: {e}")
+        return
+    finally:
+        if args.http_stats:
+            http.print_stats()
 
     if teams:
         for team in teams:
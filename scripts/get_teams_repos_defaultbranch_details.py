@@ -1,6 +1,10 @@
-import requests
 import argparse
 import csv
+import os
+
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+http = TransportPolicy()
 
 # ------------------- Fetch Teams -------------------
 def fetch_teams(org, token):
@@ -13,7 +17,7 @@ def fetch_teams(org, token):
     teams = []
     page = 1
     while True:
-        resp = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
+        resp = http.get(url, endpoint="teams", headers=headers, params={"per_page": 100, "page": page})
         if resp.status_code != 200:
             raise Exception(f"Error: {resp.status_code} - {resp.text}")
 
@@ -43,7 +47,7 @@ def fetch_repos_for_team(org, token, team_slug):
     repos = []
     page = 1
     while True:
-        resp = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
+        resp = http.get(url, endpoint="team_repos", headers=headers, params={"per_page": 100, "page": page})
         if resp.status_code != 200:
             raise Exception(f"Error: {resp.status_code} - {resp.text}")
 
@@ -73,33 +77,56 @@ def save_repos_to_csv(data, filename="team_repos.csv"):
 
 # ------------------- Main -------------------
 def main():
+    global http
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
     parser.add_argument('--org', required=True, help='GitHub Organization')
     parser.add_argument('--team_output', default="get_list_teams.csv")
     parser.add_argument('--repo_output', default="team_repos.csv")
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args)
 
     try:
-        teams = fetch_teams(args.org, args.pat)
-        if teams:
-            save_teams_to_csv(teams, args.team_output)
-    except:
-        return  # Silently fail on team fetch error
+        try:
+            teams = fetch_teams(args.org, args.pat)
+            if teams:
+                save_teams_to_csv(teams, args.team_output)
+        except DeadlineExceeded:
+            print("⚠️ Run deadline exceeded while fetching teams; nothing written")
+            return
+        except:
+            return  # Silently fail on team fetch error
 
-    try:
-        team_slugs = read_team_slugs_from_csv(args.team_output)
-        all_repos = []
-        for slug in team_slugs:
-            try:
-                repos = fetch_repos_for_team(args.org, args.pat, slug)
-                all_repos.extend(repos)
-            except:
-                continue  # Silently skip this team
-        if all_repos:
-            save_repos_to_csv(all_repos, args.repo_output)
-    except:
-        return  # Silently fail on repo fetching
+        try:
+            team_slugs = read_team_slugs_from_csv(args.team_output)
+            all_repos = []
+            truncated = False
+            for slug in team_slugs:
+                try:
+                    repos = fetch_repos_for_team(args.org, args.pat, slug)
+                    all_repos.extend(repos)
+                except DeadlineExceeded:
+                    print(f"⚠️ Run deadline exceeded at team '{slug}'; remaining teams were not fetched")
+                    truncated = True
+                    break
+                except Exception as e:
+                    print(f"⚠️ Failed to fetch repos for team '{slug}': {e}")
+                    truncated = True
+            if all_repos:
+                repo_output = args.repo_output
+                if truncated:
+                    # Keep partial results away from the file the protection scripts read
+                    root, ext = os.path.splitext(repo_output)
+                    repo_output = f"{root}_TRUNCATED{ext}"
+                    print(f"⚠️ Partial results written to {repo_output}")
+                save_repos_to_csv(all_repos, repo_output)
+        except:
+            return  # Silently fail on repo fetching
+    finally:
+        if args.http_stats:
+            http.print_stats()
 
 if __name__ == "__main__":
     main()
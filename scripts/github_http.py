@@ -0,0 +1,267 @@
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+# Status codes worth retrying on an idempotent GET
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the overall run deadline has passed.
+
+    Not a requests exception, so handlers for failed requests let it through to the caller.
+    """
+
+
+def is_rate_limited(response):
+    # GitHub signals secondary rate limits with a 403 rather than a 429
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+    )
+
+
+def rate_limit_delay(response):
+    """Seconds GitHub asks us to wait before retrying, or None if it did not say."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    reset = response.headers.get("X-RateLimit-Reset")
+    if reset and reset.isdigit():
+        return max(int(reset) - time.time(), 0) + 1
+    return None
+
+
+class EndpointPolicy:
+    def __init__(self, connect_timeout=5, read_timeout=30, max_retries=3,
+                 backoff_base=0.5, backoff_cap=8, hedge=False,
+                 hedge_min_samples=20, hedge_min_delay=0.25, max_rate_limit_wait=900):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.max_rate_limit_wait = max_rate_limit_wait
+
+    def copy(self, **overrides):
+        settings = dict(vars(self))
+        settings.update(overrides)
+        return EndpointPolicy(**settings)
+
+
+class TransportPolicy:
+    """Timeouts, run deadline, jittered GET retries and hedging for GitHub API calls.
+
+    Endpoints are plain names chosen by the caller (e.g. "contents", "commits").
+    Unknown names fall back to the default policy.
+    """
+
+    def __init__(self, default=None, endpoints=None, deadline=None, sample_size=200):
+        self.default = default or EndpointPolicy()
+        self.endpoints = dict(endpoints or {})
+        self.deadline_at = time.monotonic() + deadline if deadline else None
+        self._sample_size = sample_size
+        self._latencies = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    # ------------------- Settings -------------------
+    def policy_for(self, endpoint):
+        return self.endpoints.get(endpoint, self.default)
+
+    def remaining(self):
+        if self.deadline_at is None:
+            return None
+        return self.deadline_at - time.monotonic()
+
+    def _timeout(self, policy):
+        connect, read = policy.connect_timeout, policy.read_timeout
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded("Run deadline exceeded")
+            connect, read = min(connect, remaining), min(read, remaining)
+        return (connect, read)
+
+    # ------------------- Counters -------------------
+    def _count(self, endpoint, name):
+        with self._lock:
+            counters = self._counters.setdefault(
+                endpoint,
+                {"requests": 0, "retries": 0, "rate_limit_waits": 0, "hedges": 0, "hedge_wins": 0, "failures": 0},
+            )
+            counters[name] += 1
+
+    def _record_latency(self, endpoint, seconds):
+        with self._lock:
+            samples = self._latencies.setdefault(endpoint, deque(maxlen=self._sample_size))
+            samples.append(seconds)
+
+    def p95(self, endpoint):
+        with self._lock:
+            samples = sorted(self._latencies.get(endpoint, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def stats(self):
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+    def print_stats(self):
+        for endpoint, counters in sorted(self.stats().items()):
+            p95 = self.p95(endpoint)
+            p95_text = f"{p95:.2f}s" if p95 is not None else "n/a"
+            print(
+                f"[http] {endpoint}: {counters['requests']} requests, {counters['retries']} retries "
+                f"({counters['rate_limit_waits']} rate limited), "
+                f"{counters['hedges']} hedges ({counters['hedge_wins']} won), "
+                f"{counters['failures']} failures, p95 {p95_text}"
+            )
+
+    # ------------------- Requests -------------------
+    def _send(self, method, url, policy, endpoint, **kwargs):
+        start = time.monotonic()
+        response = requests.request(method, url, timeout=self._timeout(policy), **kwargs)
+        if response.status_code < 500:
+            self._record_latency(endpoint, time.monotonic() - start)
+        return response
+
+    def _hedge_delay(self, policy, endpoint):
+        if not policy.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies.get(endpoint, ())) < policy.hedge_min_samples:
+                return None
+        return max(self.p95(endpoint), policy.hedge_min_delay)
+
+    def _send_to(self, results, tag, url, policy, endpoint, **kwargs):
+        try:
+            results.put((tag, self._send("GET", url, policy, endpoint, **kwargs), None))
+        except Exception as e:
+            results.put((tag, None, e))
+
+    def _send_hedged(self, url, policy, endpoint, delay, **kwargs):
+        # Each attempt gets its own thread so the delay is measured from when it was sent,
+        # not from when a pool slot freed up, and a losing attempt never blocks later ones
+        results = queue.Queue()
+
+        def start(tag):
+            args = (results, tag, url, policy, endpoint)
+            threading.Thread(target=self._send_to, args=args, kwargs=kwargs, daemon=True).start()
+
+        start("primary")
+        try:
+            tag, response, error = results.get(timeout=delay)
+        except queue.Empty:
+            self._count(endpoint, "hedges")
+            start("hedge")
+            tag, response, error = results.get()
+            if error is not None:
+                # The other attempt may still succeed
+                tag, response, error = results.get()
+        if error is not None:
+            raise error
+        if tag == "hedge":
+            self._count(endpoint, "hedge_wins")
+        return response
+
+    def get(self, url, endpoint="default", **kwargs):
+        policy = self.policy_for(endpoint)
+        self._count(endpoint, "requests")
+        attempt = 0
+        while True:
+            response = None
+            try:
+                delay = self._hedge_delay(policy, endpoint)
+                if delay is not None:
+                    response = self._send_hedged(url, policy, endpoint, delay, **kwargs)
+                else:
+                    response = self._send("GET", url, policy, endpoint, **kwargs)
+                retryable = response.status_code in RETRY_STATUS_CODES or is_rate_limited(response)
+                if not retryable:
+                    return response
+                if attempt >= policy.max_retries:
+                    self._count(endpoint, "failures")
+                    return response
+            except DeadlineExceeded:
+                self._count(endpoint, "failures")
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                if attempt >= policy.max_retries:
+                    self._count(endpoint, "failures")
+                    raise
+
+            backoff = None
+            rate_limited = response is not None and is_rate_limited(response)
+            if rate_limited:
+                backoff = rate_limit_delay(response)
+            if backoff is None:
+                # Full jitter: sleep anywhere between 0 and the capped exponential step
+                backoff = random.uniform(0, min(policy.backoff_cap, policy.backoff_base * (2 ** attempt)))
+            remaining = self.remaining()
+            if remaining is not None and backoff >= remaining:
+                self._count(endpoint, "failures")
+                raise DeadlineExceeded("Run deadline exceeded while backing off")
+            if rate_limited:
+                if remaining is None and backoff > policy.max_rate_limit_wait:
+                    # Without a deadline a primary rate limit could stall the run for up to an hour
+                    print(f"[http] {endpoint}: rate limited for {int(backoff)}s, "
+                          f"more than the {policy.max_rate_limit_wait}s cap; giving up on this request")
+                    self._count(endpoint, "failures")
+                    return response
+                print(f"[http] {endpoint}: rate limited, waiting {int(backoff)}s before retrying")
+                self._count(endpoint, "rate_limit_waits")
+            time.sleep(backoff)
+            attempt += 1
+            self._count(endpoint, "retries")
+
+    def put(self, url, endpoint="default", **kwargs):
+        # Writes are not retried or hedged, only bounded by timeouts and the deadline
+        policy = self.policy_for(endpoint)
+        self._count(endpoint, "requests")
+        try:
+            return self._send("PUT", url, policy, endpoint, **kwargs)
+        except (DeadlineExceeded, requests.exceptions.RequestException):
+            self._count(endpoint, "failures")
+            raise
+
+
+# ------------------- CLI helpers -------------------
+def add_transport_arguments(parser):
+    group = parser.add_argument_group("HTTP transport")
+    # Defaults are None so an explicit flag can be told apart from a script's per-endpoint settings
+    group.add_argument('--connect_timeout', type=float, default=None,
+                       help='Per-request connect timeout in seconds (default 5); overrides per-endpoint settings')
+    group.add_argument('--read_timeout', type=float, default=None,
+                       help='Per-request read timeout in seconds (default 30); overrides per-endpoint settings')
+    group.add_argument('--max_retries', type=int, default=None,
+                       help='Retries for failed GET requests (default 3); overrides per-endpoint settings')
+    group.add_argument('--deadline', type=float, default=None, help='Overall run deadline in seconds')
+    group.add_argument('--hedge', action='store_true', help='Send a duplicate GET once a request runs past the endpoint p95')
+    group.add_argument('--http_stats', action='store_true', help='Print per-endpoint retry and hedge counters at the end')
+    return parser
+
+
+def transport_from_args(args, endpoints=None):
+    """Build a TransportPolicy from CLI args; endpoints maps names to EndpointPolicy overrides (dicts).
+
+    Flags given on the command line win over both the defaults and the per-endpoint overrides.
+    """
+    cli = {
+        name: getattr(args, name)
+        for name in ("connect_timeout", "read_timeout", "max_retries")
+        if getattr(args, name) is not None
+    }
+    default = EndpointPolicy(hedge=args.hedge, **cli)
+    overrides = {name: default.copy(**dict(settings, **cli)) for name, settings in (endpoints or {}).items()}
+    return TransportPolicy(default=default, endpoints=overrides, deadline=args.deadline)
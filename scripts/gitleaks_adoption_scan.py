@@ -0,0 +1,457 @@
+import argparse
+import base64
+import csv
+import datetime
+import math
+import os
+import re
+
+import requests
+
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+GITHUB_API_URL = "https://api.github.com"
+
+GITLEAKS_WORKFLOW_PATH = ".github/workflows/gitleaks_secret_scan.yml"
+PRE_COMMIT_PATH = ".pre-commit-config.yaml"
+
+# Central reusable workflow that repos call, whatever their own workflow file is named
+# (e.g. gitleaks_secret_scan.yml or secret-scan-repo.yml)
+REUSABLE_WORKFLOW = "gitLeaks_reusable_worflow"
+
+# Code search queries, scoped with org:<org> at run time.
+# Legacy code search skips forks unless fork:true is given.
+# The reusable workflow query goes first: its fragments usually show the `uses:` line,
+# so the other queries' hits are rarely left unconfirmed.
+WORKFLOW_QUERIES = [
+    f"fork:true path:.github/workflows {REUSABLE_WORKFLOW}",
+    "fork:true path:.github/workflows gitleaks",
+    "fork:true path:.github/workflows filename:gitleaks_secret_scan.yml",
+]
+PRE_COMMIT_QUERIES = [
+    f"fork:true filename:{PRE_COMMIT_PATH}",
+    f"fork:true filename:{PRE_COMMIT_PATH} gitleaks",
+]
+
+# Code search never returns more than this many results per query
+SEARCH_RESULT_CAP = 1000
+# Code search only indexes files smaller than this, so size: ranges up to it cover every hit
+MAX_INDEXED_FILE_SIZE = 384 * 1024
+
+# Only workflow files whose name hints at secret scanning are fetched when probing a repo
+WORKFLOW_NAME_HINTS = ("gitleaks", "secret")
+
+# Older configs still pin the pre-rename zricethezav/gitleaks URL
+GITLEAKS_REPO_RE = re.compile(r"repo:\s*['\"]?\S*github\.com[/:](?:gitleaks|zricethezav)/gitleaks(?:\.git)?/?['\"]?\s*(?:#.*)?$")
+REV_RE = re.compile(r"^\s*(?:-\s+)?rev:\s*['\"]?([^\s'\"#]+)")
+LIST_ITEM_RE = re.compile(r"^(\s*)-\s+")
+
+# Evidence that a workflow actually runs gitleaks, rather than just mentioning it
+GITLEAKS_USES_RE = re.compile(
+    rf"^\s*(?:-\s+)?uses:\s*['\"]?(?:\S*/{REUSABLE_WORKFLOW}\.ya?ml@|(?:gitleaks|zricethezav)/gitleaks-action@)",
+    re.IGNORECASE | re.MULTILINE,
+)
+GITLEAKS_RUN_RE = re.compile(
+    r"^(?!\s*#).*\b(?:gitleaks\s+(?:detect|protect|git|dir)|pre-commit\s+run\s+gitleaks)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+ENDPOINTS = {
+    "repos": {"read_timeout": 60},
+    # Code search allows 10 requests a minute, so leave room to wait out the limit
+    "search": {"read_timeout": 60, "max_retries": 6},
+    "contents": {"read_timeout": 10},
+}
+
+http = TransportPolicy()
+
+class APIError(Exception):
+    """A repo listing or code search request that did not return 200."""
+
+# ------------------- Repo inventory -------------------
+def get_all_repos(org, headers):
+    repos = []
+    page = 1
+    while True:
+        url = f"{GITHUB_API_URL}/orgs/{org}/repos"
+        resp = http.get(url, endpoint="repos", headers=headers, params={"per_page": 100, "page": page})
+        if resp.status_code != 200:
+            raise APIError(f"Error fetching repos: {resp.status_code} - {resp.text}")
+
+        repo_data = resp.json()
+        if not repo_data:
+            break
+
+        repos.extend(repo_data)
+        page += 1
+    return repos
+
+# ------------------- Code search -------------------
+def search_code(org, query, headers, gaps, size_range=None):
+    """Yield code search hits page by page; rate-limit waits are handled by the transport.
+
+    Queries with more hits than search will return are split into size: ranges.
+    Queries that still cannot be read in full are added to gaps.
+    """
+    search_headers = dict(headers, Accept="application/vnd.github.text-match+json")
+    url = f"{GITHUB_API_URL}/search/code"
+    scoped = query if size_range is None else f"{query} size:{size_range[0]}..{size_range[1]}"
+
+    seen = 0
+    incomplete = False
+    page = 1
+    while True:
+        params = {"q": f"org:{org} {scoped}", "per_page": 100, "page": page}
+        resp = http.get(url, endpoint="search", headers=search_headers, params=params)
+        if resp.status_code != 200:
+            raise APIError(f"Error searching code for '{scoped}': {resp.status_code} - {resp.text}")
+
+        data = resp.json()
+        low, high = size_range or (0, MAX_INDEXED_FILE_SIZE)
+        if page == 1 and data["total_count"] > SEARCH_RESULT_CAP and high > low:
+            # Split at the geometric mean: config and workflow files are a few KB, far below the midpoint
+            mid = min(high - 1, int(math.sqrt((low + 1) * high)))
+            yield from search_code(org, query, headers, gaps, (low, mid))
+            yield from search_code(org, query, headers, gaps, (mid + 1, high))
+            return
+
+        incomplete = incomplete or data["incomplete_results"]
+        yield from data["items"]
+        seen += len(data["items"])
+        total = min(data["total_count"], SEARCH_RESULT_CAP)
+        if not data["items"] or seen >= total:
+            break
+        page += 1
+
+    if data["total_count"] > SEARCH_RESULT_CAP or incomplete:
+        print(f"⚠️ Search results for '{scoped}' are incomplete")
+        gaps.append(scoped)
+
+def indent_of(line):
+    return len(line) - len(line.lstrip())
+
+def parse_gitleaks_rev(text):
+    """Return the rev pinned by the gitleaks entry of a pre-commit config (or fragment of one).
+
+    The rev is looked up within the same `repos:` list item as the gitleaks repo URL,
+    so it may come before or after the `repo:` key.
+    """
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if not GITLEAKS_REPO_RE.search(line):
+            continue
+        item = LIST_ITEM_RE.match(line)
+        key_col = item.end() if item else indent_of(line)
+
+        # Walk up to the "- " that opens this list item; fragments may have cut it off
+        start = i
+        while start > 0 and not (LIST_ITEM_RE.match(lines[start]) and indent_of(lines[start]) < key_col):
+            start -= 1
+        dash_col = indent_of(lines[start]) if LIST_ITEM_RE.match(lines[start]) else key_col - 2
+
+        # The item ends at the next sibling item or anything less indented than its keys
+        end = i + 1
+        while end < len(lines):
+            following = lines[end]
+            if following.strip():
+                sibling = LIST_ITEM_RE.match(following) and indent_of(following) <= dash_col
+                if sibling or (not LIST_ITEM_RE.match(following) and indent_of(following) < key_col):
+                    break
+            end += 1
+
+        for item_line in lines[start:end]:
+            match = REV_RE.match(item_line)
+            if match:
+                return match.group(1)
+    return None
+
+def mentions_gitleaks_hook(text):
+    return any(GITLEAKS_REPO_RE.search(line) for line in text.splitlines())
+
+def calls_gitleaks(text):
+    """True if workflow text calls the central reusable workflow, the gitleaks action or the gitleaks CLI/hook."""
+    return bool(GITLEAKS_USES_RE.search(text) or GITLEAKS_RUN_RE.search(text))
+
+def new_findings():
+    return {
+        "has_pre_commit_config": False,
+        "has_gitleaks_hook": False,
+        "gitleaks_rev": None,
+        "gitleaks_hook_unconfirmed": False,
+        "gitleaks_workflows": set(),
+        "unconfirmed_workflows": set(),
+    }
+
+def scan_adoption(org, headers, findings, gaps):
+    """Fill findings ({repo name: findings}) from code search alone; no files are fetched.
+
+    findings and gaps are updated in place so results gathered before an error are kept.
+    """
+    # Workflow hits only count as adoption once their text shows gitleaks being run
+    fragments_by_file = {}
+    for query in WORKFLOW_QUERIES:
+        for item in search_code(org, query, headers, gaps):
+            if not item["path"].startswith(".github/workflows/"):
+                continue
+            repo, path = item["repository"]["name"], item["path"]
+            fragments = fragments_by_file.setdefault((repo, path), [])
+            fragments.extend(m.get("fragment", "") for m in item.get("text_matches", []))
+            if calls_gitleaks("\n".join(fragments)):
+                findings.setdefault(repo, new_findings())["gitleaks_workflows"].add(path)
+
+    for repo, path in fragments_by_file:
+        repo_entry = findings.setdefault(repo, new_findings())
+        if path not in repo_entry["gitleaks_workflows"]:
+            # Fragments are short snippets; only the whole file can rule these in or out
+            repo_entry["unconfirmed_workflows"].add(path)
+
+    for query in PRE_COMMIT_QUERIES:
+        for item in search_code(org, query, headers, gaps):
+            if item["path"] != PRE_COMMIT_PATH:
+                continue
+            repo_entry = findings.setdefault(item["repository"]["name"], new_findings())
+            repo_entry["has_pre_commit_config"] = True
+            for text_match in item.get("text_matches", []):
+                fragment = text_match.get("fragment", "")
+                if mentions_gitleaks_hook(fragment):
+                    repo_entry["has_gitleaks_hook"] = True
+                rev = parse_gitleaks_rev(fragment)
+                if rev:
+                    repo_entry["has_gitleaks_hook"] = True
+                    repo_entry["gitleaks_rev"] = rev
+            if "gitleaks" in query and not repo_entry["has_gitleaks_hook"]:
+                # The term may only be in a comment; the hook counts once the file shows its repo line
+                repo_entry["gitleaks_hook_unconfirmed"] = True
+
+# ------------------- Contents probes -------------------
+def get_contents(org, repo, path, headers, skipped):
+    """Return the contents API response for path, or None if the request failed.
+
+    A 404 is returned like any other response; failures are logged and added to skipped,
+    so "could not check" is not mistaken for "file absent".
+    """
+    url = f"{GITHUB_API_URL}/repos/{org}/{repo}/contents/{path}"
+    try:
+        resp = http.get(url, endpoint="contents", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch {path} in {repo}: {e}")
+        skipped.append(f"{repo}/{path}")
+        return None
+    if resp.status_code not in (200, 404):
+        print(f"Failed to fetch {path} in {repo}: {resp.status_code} - {resp.text}")
+        skipped.append(f"{repo}/{path}")
+        return None
+    return resp
+
+def decode_content(resp):
+    return base64.b64decode(resp.json().get("content", "")).decode("utf-8", errors="replace")
+
+def fetch_file(org, repo, path, headers, skipped):
+    resp = get_contents(org, repo, path, headers, skipped)
+    if resp is None or resp.status_code != 200:
+        return None
+    return decode_content(resp)
+
+def probe_pre_commit_config(org, repo, repo_entry, headers, skipped):
+    """Set the pre-commit findings from the repo's config file; they are left as they are if the fetch failed."""
+    resp = get_contents(org, repo, PRE_COMMIT_PATH, headers, skipped)
+    if resp is None:
+        return
+    content = decode_content(resp) if resp.status_code == 200 else None
+    repo_entry["has_pre_commit_config"] = content is not None
+    repo_entry["gitleaks_rev"] = parse_gitleaks_rev(content or "")
+    repo_entry["has_gitleaks_hook"] = bool(repo_entry["gitleaks_rev"]) or mentions_gitleaks_hook(content or "")
+    repo_entry["gitleaks_hook_unconfirmed"] = False
+
+def resolve_gitleaks_revs(org, findings, headers, skipped):
+    """Fetch configs whose gitleaks hook or rev the search fragments did not show."""
+    unresolved = [
+        name for name, repo_entry in findings.items()
+        if repo_entry["gitleaks_hook_unconfirmed"] or (repo_entry["has_gitleaks_hook"] and not repo_entry["gitleaks_rev"])
+    ]
+    for name in unresolved:
+        probe_pre_commit_config(org, name, findings[name], headers, skipped)
+    if unresolved:
+        print(f"Fetched {len(unresolved)} pre-commit configs to read the gitleaks hook and rev")
+
+def confirm_workflows(org, findings, headers, skipped):
+    """Fetch workflow files that search matched but whose fragments did not show gitleaks being run."""
+    fetched = 0
+    for name, repo_entry in findings.items():
+        for path in sorted(repo_entry["unconfirmed_workflows"]):
+            resp = get_contents(org, name, path, headers, skipped)
+            fetched += 1
+            if resp is None:
+                continue  # Stays unconfirmed
+            repo_entry["unconfirmed_workflows"].discard(path)
+            if resp.status_code == 200 and calls_gitleaks(decode_content(resp)):
+                repo_entry["gitleaks_workflows"].add(path)
+    if fetched:
+        print(f"Fetched {fetched} workflow files that search fragments could not confirm")
+
+def probe_workflows(org, repo, headers, skipped):
+    resp = get_contents(org, repo, ".github/workflows", headers, skipped)
+    if resp is None or resp.status_code != 200:
+        return set()
+
+    # Same check as for search hits, so both paths agree on what counts as adoption
+    workflows = set()
+    for item in resp.json():
+        name = item["name"].lower()
+        if item["type"] != "file" or not name.endswith((".yml", ".yaml")):
+            continue
+        if not any(hint in name for hint in WORKFLOW_NAME_HINTS):
+            continue
+        content = fetch_file(org, repo, item["path"], headers, skipped)
+        if content is not None and calls_gitleaks(content):
+            workflows.add(item["path"])
+    return workflows
+
+def confirm_missing(org, repos, findings, headers, skipped, include_archived=False):
+    probed = 0
+    for repo in repos:
+        if repo["size"] == 0:
+            continue  # Empty repos have no files to find
+        if repo["archived"] and not include_archived:
+            continue
+        name = repo["name"]
+        repo_entry = findings.setdefault(name, new_findings())
+        if not repo_entry["has_pre_commit_config"]:
+            probe_pre_commit_config(org, name, repo_entry, headers, skipped)
+            probed += 1
+        if not repo_entry["gitleaks_workflows"]:
+            repo_entry["gitleaks_workflows"] = probe_workflows(org, name, headers, skipped)
+            probed += 1
+    print(f"Confirmed search gaps with {probed} contents probes")
+
+# ------------------- Report -------------------
+def gitleaks_rev_column(repo_entry):
+    if repo_entry.get("gitleaks_rev"):
+        return repo_entry["gitleaks_rev"]
+    # Keep "hook present, rev unreadable" and "gitleaks mentioned, hook not seen" distinct from "no gitleaks hook"
+    if repo_entry.get("has_gitleaks_hook"):
+        return "Unknown"
+    return "Unconfirmed" if repo_entry.get("gitleaks_hook_unconfirmed") else ""
+
+def build_report(repos, findings):
+    rows = []
+    for repo in sorted(repos, key=lambda r: r["name"].lower()):
+        repo_entry = findings.get(repo["name"], {})
+        workflows = sorted(repo_entry.get("gitleaks_workflows", ()))
+        rows.append([
+            repo["name"],
+            repo["default_branch"],
+            repo["archived"],
+            repo_entry.get("has_pre_commit_config", False),
+            gitleaks_rev_column(repo_entry),
+            GITLEAKS_WORKFLOW_PATH in workflows,
+            bool(workflows),
+            ";".join(workflows),
+            ";".join(sorted(repo_entry.get("unconfirmed_workflows", ()))),
+        ])
+    return rows
+
+def save_report(rows, filename):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "Repo Name",
+            "Default Branch",
+            "Archived",
+            "Has .pre-commit-config.yaml",
+            "Gitleaks Hook Rev",
+            "Has gitleaks_secret_scan.yml",
+            "Gitleaks Workflow Adopted",
+            "Gitleaks Workflow Files",
+            "Unconfirmed Workflow Files",
+        ])
+        writer.writerows(rows)
+
+def main():
+    global http
+
+    parser = argparse.ArgumentParser(description="Org-wide gitleaks workflow and pre-commit adoption scan using code search")
+    parser.add_argument('--pat', required=True, help='GitHub Personal Access Token')
+    parser.add_argument('--org', required=True, help='GitHub Organization')
+    parser.add_argument('--fetch_unconfirmed', action='store_true',
+                        help='Fetch the files search matched but whose fragments did not show gitleaks use or its rev')
+    parser.add_argument('--confirm_missing', action='store_true',
+                        help='Probe the contents API for repos that code search reports as missing')
+    parser.add_argument('--include_archived', action='store_true',
+                        help='With --confirm_missing, also probe archived repos')
+    parser.add_argument('--output', default=None, help='Output CSV (defaults to a timestamped file)')
+    add_transport_arguments(parser)
+    args = parser.parse_args()
+    http = transport_from_args(args, ENDPOINTS)
+
+    headers = {
+        "Authorization": f"Bearer {args.pat}",
+        "Accept": "application/vnd.github+json"
+    }
+
+    try:
+        print(f"🔍 Fetching repository inventory for '{args.org}'...")
+        try:
+            repos = get_all_repos(args.org, headers)
+        except DeadlineExceeded:
+            print("⚠️ Run deadline exceeded before the repository inventory was complete; no report written")
+            return
+        except (requests.exceptions.RequestException, APIError) as e:
+            print(f"⚠️ Could not load the repository inventory: {e}; no report written")
+            return
+        print(f"Total repositories found: {len(repos)}")
+
+        findings = {}
+        gaps = []
+        skipped = []
+        stopped = None
+        try:
+            print("Searching org code for gitleaks workflows and pre-commit configs...")
+            scan_adoption(args.org, headers, findings, gaps)
+
+            if args.fetch_unconfirmed:
+                confirm_workflows(args.org, findings, headers, skipped)
+                resolve_gitleaks_revs(args.org, findings, headers, skipped)
+
+            if args.confirm_missing:
+                confirm_missing(args.org, repos, findings, headers, skipped, args.include_archived)
+        except DeadlineExceeded:
+            stopped = "the run deadline was hit before the scan finished; rerun with a longer --deadline"
+        except (requests.exceptions.RequestException, APIError) as e:
+            print(f"⚠️ Scan stopped early: {e}")
+            stopped = "a request failed before the scan finished"
+
+        # Repos past a capped query are only covered if --confirm_missing probed all of them
+        unprobed_archived = not args.include_archived and any(r["archived"] for r in repos)
+        uncovered_gaps = gaps if not args.confirm_missing or unprobed_archived else []
+        truncated = stopped is not None or bool(skipped) or bool(uncovered_gaps)
+        rows = build_report(repos, findings)
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = args.output or f"gitleaks_adoption_{timestamp}.csv"
+        if truncated:
+            # Mark partial reports in the file name so they are not mistaken for a full scan
+            root, ext = os.path.splitext(filename)
+            filename = f"{root}_TRUNCATED{ext}"
+        save_report(rows, filename)
+
+        adopted = sum(1 for row in rows if row[6])
+        with_pre_commit = sum(1 for row in rows if row[3])
+        print(f"Gitleaks workflow: {adopted}/{len(rows)} repos, pre-commit config: {with_pre_commit}/{len(rows)} repos")
+        print(f"📄 Saved to {filename}")
+        if stopped:
+            print(f"⚠️ TRUNCATED: {stopped}. Repos not reached are reported as missing.")
+        if skipped:
+            print(f"⚠️ TRUNCATED: {len(skipped)} files could not be fetched, so their repos may be under-reported.")
+        if uncovered_gaps:
+            print(f"⚠️ TRUNCATED: {len(uncovered_gaps)} searches returned incomplete results; "
+                  "rerun with --confirm_missing (and --include_archived) to probe the repos they missed.")
+        unconfirmed = sum(1 for row in rows if row[4] == "Unconfirmed" or row[8])
+        if unconfirmed and not args.fetch_unconfirmed:
+            print(f"{unconfirmed} repos have search hits that fragments could not confirm; "
+                  "rerun with --fetch_unconfirmed to check the files.")
+    finally:
+        if args.http_stats:
+            http.print_stats()
+
+if __name__ == "__main__":
+    main()
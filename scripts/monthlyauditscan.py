@@ -1,8 +1,19 @@
-import requests
 import datetime
 import csv
 import argparse
 
+import requests
+
+from github_http import DeadlineExceeded, TransportPolicy, add_transport_arguments, transport_from_args
+
+# Per-endpoint overrides; contents probes are tiny so a stuck one is cut short
+ENDPOINTS = {
+    "repos": {"read_timeout": 60},
+    "contents": {"read_timeout": 10},
+}
+
+http = TransportPolicy()
+
 # Function to get repositories created in the last 30 days
 def get_repos_created_last_30_days(github_token, org_name):
     github_api_url = f"https://api.github.com/orgs/{org_name}/repos"
@@ -19,13 +30,20 @@ def get_repos_created_last_30_days(github_token, org_name):
     }
 
     repo_list = []
+    truncated = False
     page = 1
     while True:
         params['page'] = page
-        response = requests.get(github_api_url, headers=headers, params=params)
+        try:
+            response = http.get(github_api_url, endpoint="repos", headers=headers, params=params)
+        except (DeadlineExceeded, requests.exceptions.RequestException) as e:
+            print(f"Failed to fetch repos: {e}")
+            truncated = True
+            break
 
         if response.status_code != 200:
             print(f"Failed to fetch repos: {response.status_code} - {response.text}")
+            truncated = True
             break
 
         repos = response.json()
@@ -38,13 +56,17 @@ def get_repos_created_last_30_days(github_token, org_name):
                 default_branch = repo['default_branch']
                 full_name = repo['full_name']
 
-                creator = get_repo_creator(full_name, headers)
-                last_updated_by = get_last_updated_by(full_name, headers)
-                has_pre_commit_config = check_pre_commit_config(full_name, headers)
-                has_gitleaks_workflow = check_gitleaks_workflow(full_name, headers)
-                custom_properties = get_repo_custom_properties(full_name, headers)
-                branch_protection_enabled = check_branch_protection(full_name, default_branch, headers)
-                rulesets_enabled = check_rulesets(org_name, repo['name'], headers)
+                try:
+                    creator = get_repo_creator(full_name, headers)
+                    last_updated_by = get_last_updated_by(full_name, headers)
+                    has_pre_commit_config = check_pre_commit_config(full_name, headers)
+                    has_gitleaks_workflow = check_gitleaks_workflow(full_name, headers)
+                    custom_properties = get_repo_custom_properties(full_name, headers)
+                    branch_protection_enabled = check_branch_protection(full_name, default_branch, headers)
+                    rulesets_enabled = check_rulesets(org_name, repo['name'], headers)
+                except DeadlineExceeded:
+                    print("Run deadline exceeded; writing partial results")
+                    return repo_list, True
 
                 repo_list.append({
                     'name': repo['name'],
@@ -61,11 +83,15 @@ def get_repos_created_last_30_days(github_token, org_name):
 
         page += 1
 
-    return repo_list
+    return repo_list, truncated
 
 def get_repo_creator(repo_full_name, headers):
     events_url = f"https://api.github.com/repos/{repo_full_name}/events"
-    response = requests.get(events_url, headers=headers)
+    try:
+        response = http.get(events_url, endpoint="events", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch events for {repo_full_name}: {e}")
+        return "Unknown"
     if response.status_code != 200:
         print(f"Failed to fetch events for {repo_full_name}: {response.status_code} - {response.text}")
         return "Unknown"
@@ -77,7 +103,11 @@ def get_repo_creator(repo_full_name, headers):
 
 def get_last_updated_by(repo_full_name, headers):
     commits_url = f"https://api.github.com/repos/{repo_full_name}/commits?per_page=1"
-    response = requests.get(commits_url, headers=headers)
+    try:
+        response = http.get(commits_url, endpoint="commits", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch commits for {repo_full_name}: {e}")
+        return "Unknown"
     if response.status_code != 200:
         print(f"Failed to fetch commits for {repo_full_name}: {response.status_code} - {response.text}")
         return "Unknown"
@@ -88,17 +118,41 @@ def get_last_updated_by(repo_full_name, headers):
 
 def check_pre_commit_config(repo_full_name, headers):
     contents_url = f"https://api.github.com/repos/{repo_full_name}/contents/.pre-commit-config.yaml"
-    response = requests.get(contents_url, headers=headers)
-    return response.status_code == 200
+    try:
+        response = http.get(contents_url, endpoint="contents", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch contents for {repo_full_name}: {e}")
+        return "Unknown"
+    if response.status_code == 200:
+        return True
+    elif response.status_code == 404:
+        return False
+    else:
+        print(f"Failed to fetch contents for {repo_full_name}: {response.status_code} - {response.text}")
+        return "Unknown"
 
 def check_gitleaks_workflow(repo_full_name, headers):
     workflow_url = f"https://api.github.com/repos/{repo_full_name}/contents/.github/workflows/gitleaks_secret_scan.yml"
-    response = requests.get(workflow_url, headers=headers)
-    return response.status_code == 200
+    try:
+        response = http.get(workflow_url, endpoint="contents", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch contents for {repo_full_name}: {e}")
+        return "Unknown"
+    if response.status_code == 200:
+        return True
+    elif response.status_code == 404:
+        return False
+    else:
+        print(f"Failed to fetch contents for {repo_full_name}: {response.status_code} - {response.text}")
+        return "Unknown"
 
 def get_repo_custom_properties(repo_full_name, headers):
     custom_properties_url = f"https://api.github.com/repos/{repo_full_name}/properties/values"
-    response = requests.get(custom_properties_url, headers=headers)
+    try:
+        response = http.get(custom_properties_url, endpoint="properties", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch custom properties for {repo_full_name}: {e}")
+        return "Unknown"
     if response.status_code == 200:
         custom_properties = response.json()
         for prop in custom_properties:
@@ -111,7 +165,11 @@ def get_repo_custom_properties(repo_full_name, headers):
 
 def check_branch_protection(repo_full_name, default_branch, headers):
     protection_url = f"https://api.github.com/repos/{repo_full_name}/branches/{default_branch}/protection"
-    response = requests.get(protection_url, headers=headers)
+    try:
+        response = http.get(protection_url, endpoint="protection", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to check branch protection for {repo_full_name}: {e}")
+        return "Unknown"
     if response.status_code == 200:
         return True
     elif response.status_code == 404:
@@ -122,7 +180,11 @@ def check_branch_protection(repo_full_name, default_branch, headers):
 
 def check_rulesets(org_name, repo_name, headers):
     url = f"https://api.github.com/repos/{org_name}/{repo_name}/rulesets"
-    response = requests.get(url, headers=headers)
+    try:
+        response = http.get(url, endpoint="rulesets", headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Error checking rulesets for {repo_name}: {e}")
+        return "Unknown"
     if response.status_code == 200:
         rulesets = response.json()
         return len(rulesets) > 0
@@ -136,13 +198,17 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Fetch GitHub org repos created in the last 30 days with metadata.')
     parser.add_argument('-pat', '--github_token', type=str, required=True, help='GitHub Personal Access Token')
     parser.add_argument('-org', '--org_name', type=str, required=True, help='GitHub Organization Name')
+    add_transport_arguments(parser)
     args = parser.parse_args()
+    http = transport_from_args(args, ENDPOINTS)
 
-    repos_last_30_days = get_repos_created_last_30_days(args.github_token, args.org_name)
+    repos_last_30_days, truncated = get_repos_created_last_30_days(args.github_token, args.org_name)
 
-    if repos_last_30_days:
+    if repos_last_30_days or truncated:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"repos_last_30_days_{timestamp}.csv"
+        # Mark partial runs in the file name so they are not mistaken for a full audit
+        suffix = "_TRUNCATED" if truncated else ""
+        filename = f"repos_last_30_days_{timestamp}{suffix}.csv"
         with open(filename, mode='w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
             writer.writerow([
@@ -171,5 +237,10 @@ if __name__ == "__main__":
                     repo['default_branch']
                 ])
         print(f"Results saved to '{filename}'")
+        if truncated:
+            print("⚠️ The run was cut short; the results above are incomplete")
     else:
         print(f"No repositories created in the last 30 days for organization '{args.org_name}'.")
+
+    if args.http_stats:
+        http.print_stats()